@@ -1,52 +1,430 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse, Response, HTMLResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi.responses import StreamingResponse, Response, FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.middleware.gzip import GZipMiddleware
+import base64
+import collections
+import functools
 import io
+import json
+import os
+import re
+import subprocess
+
+# Pin BLAS pools before torch loads them: TTS requests are batch-1, where
+# a spinning thread team per small matmul is a large net loss. These are
+# defaults only — export the env vars to override.
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+
+import numpy as np
+import torch
 from kokoro import KPipeline
 import soundfile as sf
-from pydub import AudioSegment
 import asyncio
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from openai import AsyncOpenAI
 
-app = FastAPI()
+# Shared with the CLI and daemon: per-language warmup voices and the FP16
+# model+voice-pack cast (see tts.py)
+from tts import DEFAULT_VOICES, _half_voices
 
-# Initialize pipelines for different languages
-pipelines = {
-    'a': KPipeline(lang_code='a'),  # American English
-    'b': KPipeline(lang_code='b'),  # British English
-    'f': KPipeline(lang_code='f'),  # French
-    'h': KPipeline(lang_code='h'),  # Hindi
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pipelines are built lazily by get_pipeline, so a worker only ever
+    # loads the languages it actually serves; nothing to set up here
+    yield
+    pipelines.clear()
+
+class SelectiveGZipMiddleware:
+    """Gzip JSON/HTML responses but leave audio routes alone.
+
+    MP3/OGG/Opus are already compressed and raw PCM streams are latency
+    sensitive, so re-compressing them burns CPU for nothing and can stall
+    chunked delivery.
+    """
+    def __init__(self, app, minimum_size: int = 512):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope.get("type") == "http" and scope["path"].startswith(("/tts", "/stt", "/chat/speak")):
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(SelectiveGZipMiddleware)
+app.mount("/static", StaticFiles(directory="static"), name="static")
+
+# How many text chunks to synthesize ahead of the one currently streaming
+MAX_CONCURRENT_CHUNKS = 3
+
+# One shared client so the httpx connection pool and TLS state are reused
+# across /chat/respond calls instead of being rebuilt per request
+openai_client = AsyncOpenAI()
+
+def make_pipeline(lang_code: str) -> KPipeline:
+    """Build a pipeline, casting the model to FP16 on CUDA.
+
+    Half precision halves weight bandwidth and roughly doubles tensor-core
+    throughput for an 82M-param model with no audible quality change.
+    """
+    if torch.cuda.is_available():
+        # Free matmul throughput on Ampere+ tensor cores; no audible change
+        torch.set_float32_matmul_precision('high')
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+    pipeline = KPipeline(lang_code=lang_code)
+    if os.environ.get('KOKORO_COMPILE') == '1' and getattr(pipeline, 'model', None) is not None:
+        # Opt-in JIT: fuses pointwise ops and removes Python dispatch from
+        # the forward pass; compiled kernels persist in the inductor cache
+        # so later restarts skip most of the compile cost
+        try:
+            pipeline.model = torch.compile(pipeline.model)
+        except Exception:
+            pass  # older torch or unsupported backend — stay eager
+    if torch.cuda.is_available() and getattr(pipeline, 'model', None) is not None:
+        pipeline.model = pipeline.model.half()
+        _half_voices(pipeline)
+        # Run one short synthesis now so the first real request doesn't pay
+        # CUDA context init, cudnn autotune and kernel-compile latency
+        try:
+            for _ in pipeline("Warm up.", voice=DEFAULT_VOICES[lang_code]):
+                pass
+        except Exception as e:
+            # A failed warmup usually means every real request will fail the
+            # same way — make it visible instead of booting "healthy"
+            print(f"Warning: warmup synthesis failed for '{lang_code}': {e}")
+    return pipeline
+
+# Languages we can serve; the pipeline for each is built on first use so
+# single-language deployments don't pay for the other three models
+SUPPORTED_LANGS = {
+    'a': 'American English',
+    'b': 'British English',
+    'f': 'French',
+    'h': 'Hindi',
+}
+
+pipelines = {}
+_pipelines_lock = asyncio.Lock()
+
+async def get_pipeline(lang_code: str) -> KPipeline:
+    """Return the pipeline for a language code, creating it on first use"""
+    if lang_code not in SUPPORTED_LANGS:
+        raise HTTPException(status_code=400, detail=f"Unsupported language code: {lang_code}")
+    pipeline = pipelines.get(lang_code)
+    if pipeline is None:
+        async with _pipelines_lock:
+            pipeline = pipelines.get(lang_code)
+            if pipeline is None:
+                pipeline = await asyncio.to_thread(make_pipeline, lang_code)
+                pipelines[lang_code] = pipeline
+    return pipeline
+
+class BufPool:
+    """Reuse BytesIO buffers across requests to cut allocation/GC churn"""
+    def __init__(self):
+        self._buffers = collections.deque()
+
+    def acquire(self) -> io.BytesIO:
+        try:
+            return self._buffers.pop()
+        except IndexError:
+            return io.BytesIO()
+
+    def release(self, buf: io.BytesIO):
+        buf.seek(0)
+        buf.truncate(0)
+        self._buffers.append(buf)
+
+buf_pool = BufPool()
+
+# Sentence boundary: any run of whitespace right after closing punctuation.
+# Compiled once at import; the lookbehind keeps the punctuation attached to
+# its sentence so nothing has to be re-appended after splitting.
+_SENT_RE = re.compile(r'(?<=[.!?。…])\s+')
+
+def split_text(text: str, max_chars: int = 300) -> list:
+    """Split text into sentence-aligned chunks of bounded length.
+
+    Splitting on sentence boundaries instead of a fixed character window
+    keeps prosody intact and avoids handing the model broken trailing words.
+    """
+    sentences = [s for s in _SENT_RE.split(text) if s]
+    if not sentences:
+        return []
+    # Greedy packing via cumulative lengths: each break point is one
+    # searchsorted over the prefix sums instead of a per-sentence Python
+    # branch, and each chunk is a single join over its slice.
+    cum = np.cumsum(np.fromiter((len(s) + 1 for s in sentences),
+                                dtype=np.int64, count=len(sentences)))
+    chunks = []
+    start = 0
+    while start < len(sentences):
+        base = cum[start - 1] if start else 0
+        end = int(np.searchsorted(cum, base + max_chars, side='right'))
+        end = max(end, start + 1)  # an oversized sentence still gets a chunk
+        chunks.append(' '.join(sentences[start:end]))
+        start = end
+    return chunks
+
+def to_numpy(audio) -> np.ndarray:
+    """Move pipeline output to host float32 numpy, exactly once.
+
+    KPipeline yields torch tensors (on the GPU when CUDA is used). This is
+    the single device-to-host hop in the request path; everything after it
+    — crossfade, PCM conversion, encoding — stays in numpy, so no tensor/
+    array ping-pong re-copies the waveform.
+    """
+    if isinstance(audio, torch.Tensor):
+        return audio.detach().to('cpu', dtype=torch.float32).numpy()
+    return np.asarray(audio, dtype=np.float32)
+
+# Overlap used when joining generated segments (10 ms at 24 kHz)
+CROSSFADE_SAMPLES = 240
+
+@functools.lru_cache(maxsize=8)
+def _fades(n: int):
+    """Constant fade-out/fade-in ramps, materialized once per overlap length"""
+    fade_in = np.linspace(0.0, 1.0, n, dtype=np.float32)
+    return 1.0 - fade_in, fade_in
+
+def crossfade_concat(chunks: list) -> np.ndarray:
+    """Join waveforms with a short linear crossfade at each boundary.
+
+    Hard cuts between independently generated segments click audibly; a
+    10 ms blend removes that for the cost of one small multiply-add. The
+    output length is known up front, so the result is written into one
+    preallocated buffer — no intermediate piece list or final concatenate.
+    """
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    if len(chunks) == 1:
+        return chunks[0]
+
+    # Overlap at each boundary, accounting for chunks shorter than 2x overlap
+    overlaps = []
+    prev_len = len(chunks[0])
+    for nxt in chunks[1:]:
+        n = min(CROSSFADE_SAMPLES, prev_len, len(nxt))
+        overlaps.append(n)
+        prev_len = len(nxt) - n
+
+    out = np.empty(sum(len(c) for c in chunks) - sum(overlaps), dtype=np.float32)
+    offset = 0
+    prev = chunks[0]
+    for nxt, n in zip(chunks[1:], overlaps):
+        body = prev[:-n] if n else prev
+        out[offset:offset + len(body)] = body
+        offset += len(body)
+        if n:
+            fade_out, fade_in = _fades(n)
+            out[offset:offset + n] = prev[-n:] * fade_out + nxt[:n] * fade_in
+            offset += n
+            prev = nxt[n:]
+        else:
+            prev = nxt
+    out[offset:] = prev
+    return out
+
+async def stream_crossfaded(tasks) -> AsyncGenerator[np.ndarray, None]:
+    """Yield crossfaded audio incrementally from ordered synthesis tasks.
+
+    Streaming the blended tail as each chunk completes keeps peak memory at
+    one chunk instead of materializing the whole waveform before encoding.
+    """
+    prev = None
+    for task in tasks:
+        nxt = await task
+        if prev is None:
+            prev = nxt
+            continue
+        n = min(CROSSFADE_SAMPLES, len(prev), len(nxt))
+        if n:
+            fade_out, fade_in = _fades(n)
+            yield prev[:-n]
+            yield prev[-n:] * fade_out + nxt[:n] * fade_in
+            prev = nxt[n:]
+        else:
+            yield prev
+            prev = nxt
+    if prev is not None:
+        yield prev
+
+def synthesize_all(pipeline, text: str, voice: str) -> np.ndarray:
+    """Run the blocking pipeline to completion and return the full waveform.
+
+    This does torch inference synchronously, so callers must run it in a
+    worker thread (asyncio.to_thread) to keep the event loop responsive.
+    """
+    with torch.inference_mode():
+        chunks = [to_numpy(a) for _, _, a in pipeline(text, voice=voice)]
+    return crossfade_concat(chunks)
+
+# Micro-batching was tried here but KPipeline has no batched forward, so a
+# single collecting worker only serialized every job through one thread and
+# added a 20 ms window on top. Plain to_thread dispatch keeps concurrent
+# jobs on separate worker threads (bounded per stream by the semaphore in
+# generate_audio_chunks).
+async def synthesize_chunk(pipeline, text: str, voice: str) -> np.ndarray:
+    """Run one synthesis job in a worker thread, off the event loop"""
+    return await asyncio.to_thread(synthesize_all, pipeline, text, voice)
+
+try:
+    # Fuse clip+scale+cast into one SIMD pass when numba is available;
+    # plain numpy materializes an intermediate float array for the same work
+    from numba import njit, prange
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _f32_to_i16_kernel(x, out):
+        for i in prange(x.size):
+            v = x[i] * 32767.0
+            if v < -32768.0:
+                v = -32768.0
+            elif v > 32767.0:
+                v = 32767.0
+            out[i] = np.int16(v)
+
+    def f32_to_i16(audio: np.ndarray) -> np.ndarray:
+        """Convert float32 samples in [-1, 1] to int16 PCM"""
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        out = np.empty(audio.size, dtype=np.int16)
+        _f32_to_i16_kernel(audio, out)
+        return out
+except ImportError:
+    def f32_to_i16(audio: np.ndarray) -> np.ndarray:
+        """Convert float32 samples in [-1, 1] to int16 PCM"""
+        return np.clip(audio * 32767, -32768, 32767).astype('<i2')
+
+def streaming_wav_header(sample_rate: int = 24000, channels: int = 1) -> bytes:
+    """Build a 44-byte RIFF header with unknown length for streamed 16-bit WAV"""
+    byte_rate = sample_rate * channels * 2
+    return (
+        b'RIFF' + (0xFFFFFFFF).to_bytes(4, 'little') + b'WAVE'
+        + b'fmt ' + (16).to_bytes(4, 'little')
+        + (1).to_bytes(2, 'little')            # PCM
+        + channels.to_bytes(2, 'little')
+        + sample_rate.to_bytes(4, 'little')
+        + byte_rate.to_bytes(4, 'little')
+        + (channels * 2).to_bytes(2, 'little')  # block align
+        + (16).to_bytes(2, 'little')            # bits per sample
+        + b'data' + (0xFFFFFFFF).to_bytes(4, 'little')
+    )
+
+# ffmpeg codec/muxer arguments for each lossy output format
+FFMPEG_FORMATS = {
+    'mp3': ['-f', 'mp3', '-b:a', '192k'],
+    'ogg': ['-f', 'ogg', '-c:a', 'libvorbis', '-b:a', '192k'],
+    'aac': ['-f', 'adts', '-c:a', 'aac', '-b:a', '192k'],
+    'opus': ['-f', 'opus', '-c:a', 'libopus', '-b:a', '160k'],
 }
 
-async def generate_audio_chunks(text: str, voice: str) -> AsyncGenerator[bytes, None]:
+CONTENT_TYPES = {
+    'mp3': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'ogg': 'audio/ogg',
+    'aac': 'audio/aac',
+    'opus': 'audio/opus',
+}
+
+def encode_audio(samples: np.ndarray, fmt: str) -> bytes:
+    """Encode float32 samples to a lossy format with one ffmpeg subprocess.
+
+    ffmpeg reads raw PCM from stdin, so there is no intermediate WAV
+    encode/decode and no pydub layer — one process, one pass.
+    """
+    result = subprocess.run(
+        ['ffmpeg', '-v', 'quiet', '-f', 'f32le', '-ar', '24000', '-ac', '1', '-i', 'pipe:0']
+        + FFMPEG_FORMATS[fmt] + ['pipe:1'],
+        input=np.asarray(samples, dtype=np.float32).tobytes(),
+        stdout=subprocess.PIPE, check=True)
+    return result.stdout
+
+async def encode_mp3_stream(pcm_chunks) -> AsyncGenerator[bytes, None]:
+    """Encode an async stream of float32 waveforms to MP3 frames.
+
+    One long-lived ffmpeg process handles the whole stream: raw PCM in,
+    MP3 out. This avoids the per-chunk WAV round-trip through pydub, which
+    spawned a fresh ffmpeg process for every chunk.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        'ffmpeg', '-v', 'quiet',
+        '-f', 'f32le', '-ar', '24000', '-ac', '1', '-i', 'pipe:0',
+        '-f', 'mp3', '-b:a', '192k', 'pipe:1',
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+    )
+
+    async def feed_pcm():
+        # Pipe each chunk's raw samples into the encoder as it arrives.
+        # stdin must close even when the source raises, otherwise ffmpeg
+        # keeps waiting for input and the reader never sees EOF.
+        try:
+            async for audio in pcm_chunks:
+                proc.stdin.write(np.asarray(audio, dtype=np.float32).tobytes())
+                await proc.stdin.drain()
+        finally:
+            proc.stdin.close()
+
+    feeder = asyncio.create_task(feed_pcm())
+    finished = False
+    try:
+        while True:
+            mp3_chunk = await proc.stdout.read(64 * 1024)
+            if not mp3_chunk:
+                break
+            yield mp3_chunk
+        # EOF on stdout: re-raise a failed source here so the stream ends
+        # with an error instead of passing for a complete response
+        await feeder
+        finished = True
+    finally:
+        feeder.cancel()
+        await asyncio.gather(feeder, return_exceptions=True)
+        if not finished:
+            # Early exit (client disconnect or source failure): ffmpeg is
+            # still running and wait() would block once its stdout pipe
+            # fills, leaving a hung task and a zombie encoder per request
+            proc.kill()
+        await proc.wait()
+
+async def generate_audio_chunks(text: str, voice: str, format: str = 'mp3') -> AsyncGenerator[bytes, None]:
     """Generate audio in chunks as it's being processed"""
     # Get the appropriate pipeline based on voice prefix
-    lang_code = voice[0]
-    pipeline = pipelines[lang_code]
-    
-    # Split text into smaller chunks for processing
-    chunk_size = 200  # characters
-    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
-    
-    for chunk in chunks:
-        # Generate audio for this chunk
-        generator = pipeline(chunk, voice=voice)
-        for _, _, audio in generator:
-            # Convert numpy array to WAV bytes
-            wav_buffer = io.BytesIO()
-            sf.write(wav_buffer, audio, 24000, format='wav')
-            wav_buffer.seek(0)
-            
-            # Convert to MP3 and yield
-            audio_segment = AudioSegment.from_wav(wav_buffer)
-            chunk_buffer = io.BytesIO()
-            audio_segment.export(chunk_buffer, format='mp3')
-            
-            # Yield this chunk
-            yield chunk_buffer.getvalue()
-            
-            # Small delay to prevent overwhelming the client
-            await asyncio.sleep(0.1)
+    pipeline = await get_pipeline(voice[0])
+
+    # Split text on sentence boundaries rather than a fixed character window
+    chunks = split_text(text)
+
+    # Synthesize up to MAX_CONCURRENT_CHUNKS chunks ahead of the one being
+    # streamed. Tasks run the blocking pipeline in worker threads and the
+    # feeder consumes them strictly in order, so output order is preserved.
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+    async def synthesize_bounded(chunk: str) -> np.ndarray:
+        async with semaphore:
+            return await synthesize_chunk(pipeline, chunk, voice)
+
+    tasks = [asyncio.create_task(synthesize_bounded(chunk)) for chunk in chunks]
+
+    if format == 'wav':
+        # No encoder needed: emit a streaming WAV header once, then raw
+        # int16 PCM per chunk. First audio arrives as soon as the model is
+        # done with chunk 0 — no ffmpeg startup on the critical path.
+        yield streaming_wav_header()
+        async for audio in stream_crossfaded(tasks):
+            yield f32_to_i16(audio).tobytes()
+        return
+
+    async for mp3_chunk in encode_mp3_stream(stream_crossfaded(tasks)):
+        # Yield this chunk; the yield itself awaits if the client's
+        # socket buffer is full, so no artificial pacing is needed
+        yield mp3_chunk
 
 @app.get("/tts")
 async def text_to_speech(
@@ -60,55 +438,32 @@ async def text_to_speech(
             raise HTTPException(status_code=400, detail="Unsupported audio format")
 
         # Get the appropriate pipeline based on voice prefix
-        lang_code = voice[0]
-        if lang_code not in pipelines:
-            raise HTTPException(status_code=400, detail=f"Unsupported language code: {lang_code}")
-        
-        pipeline = pipelines[lang_code]
-
-        # Generate audio
-        generator = pipeline(text, voice=voice)
-        audio = None
-        for _, _, audio_chunk in generator:
-            if audio is None:
-                audio = audio_chunk
-            else:
-                audio = np.concatenate([audio, audio_chunk])
-
-        # Convert to bytes
-        wav_buffer = io.BytesIO()
-        sf.write(wav_buffer, audio, 24000, format='wav')
-        wav_buffer.seek(0)
-
-        # Convert to desired format
-        audio_segment = AudioSegment.from_wav(wav_buffer)
-        output_buffer = io.BytesIO()
-
-        # Format-specific export settings
-        format_settings = {
-            'mp3': {'format': 'mp3', 'bitrate': '192k'},
-            'wav': {'format': 'wav'},
-            'ogg': {'format': 'ogg', 'codec': 'libvorbis', 'bitrate': '192k'},
-            'aac': {'format': 'm4a', 'codec': 'aac', 'bitrate': '192k'},
-            'opus': {'format': 'opus', 'codec': 'libopus', 'bitrate': '160k'}
-        }
+        pipeline = await get_pipeline(voice[0])
 
-        # Export to buffer
-        audio_segment.export(output_buffer, **format_settings[format])
-        output_buffer.seek(0)
-
-        # Set content type based on format
-        content_types = {
-            'mp3': 'audio/mpeg',
-            'wav': 'audio/wav',
-            'ogg': 'audio/ogg',
-            'aac': 'audio/aac',
-            'opus': 'audio/opus',
-        }
+        # Generate audio via the micro-batching worker, off the event loop
+        audio = await synthesize_chunk(pipeline, text, voice)
 
-        return StreamingResponse(
-            output_buffer,
-            media_type=content_types[format],
+        # WAV needs no transcoding — write it once and return the buffer
+        if format == 'wav':
+            wav_buffer = buf_pool.acquire()
+            # PCM_16 halves the payload vs the float32 default; Kokoro output
+            # is perceptually 16-bit anyway and every client downconverts
+            sf.write(wav_buffer, audio, 24000, format='wav', subtype='PCM_16')
+            wav_buffer.seek(0)
+            return StreamingResponse(
+                iter_file(wav_buffer, pool=buf_pool),
+                media_type='audio/wav',
+                headers={
+                    'Content-Disposition': 'attachment; filename="audio.wav"'
+                }
+            )
+
+        # Lossy formats: feed raw PCM straight to one ffmpeg subprocess
+        encoded = await asyncio.to_thread(encode_audio, audio, format)
+
+        return Response(
+            encoded,
+            media_type=CONTENT_TYPES[format],
             headers={
                 'Content-Disposition': f'attachment; filename="audio.{format}"'
             }
@@ -121,21 +476,23 @@ async def text_to_speech(
 async def text_to_speech_stream(
     text: str,
     voice: str = "af_heart",
+    format: str = "mp3",
 ):
     """Stream audio chunks as they're generated"""
     try:
-        # Get the appropriate pipeline based on voice prefix
-        lang_code = voice[0]
-        if lang_code not in pipelines:
-            raise HTTPException(status_code=400, detail=f"Unsupported language code: {lang_code}")
-        
-        pipeline = pipelines[lang_code]
+        # MP3 for bandwidth-constrained clients, WAV for lowest latency
+        # (raw PCM needs no encoder between the model and the socket)
+        if format not in ['mp3', 'wav']:
+            raise HTTPException(status_code=400, detail="Unsupported streaming format")
+
+        # Validate the voice prefix and warm the pipeline before streaming
+        await get_pipeline(voice[0])
 
         return StreamingResponse(
-            generate_audio_chunks(text, voice),
-            media_type='audio/mpeg',
+            generate_audio_chunks(text, voice, format),
+            media_type='audio/wav' if format == 'wav' else 'audio/mpeg',
             headers={
-                'Content-Disposition': 'attachment; filename="audio.mp3"'
+                'Content-Disposition': f'attachment; filename="audio.{format}"'
             }
         )
 
@@ -143,13 +500,15 @@ async def text_to_speech_stream(
         raise HTTPException(status_code=500, detail=str(e))
 
 # Alternative approach: Stream the complete file in chunks
-async def iter_file(file_like, chunk_size: int = 1024 * 1024):
-    """Stream a file-like object in chunks"""
+async def iter_file(file_like, chunk_size: int = 1024 * 1024, pool: BufPool = None):
+    """Stream a file-like object in chunks, returning it to a pool when done"""
     while True:
         chunk = file_like.read(chunk_size)
         if not chunk:
             break
         yield chunk
+    if pool is not None:
+        pool.release(file_like)
 
 @app.get("/tts/stream-file")
 async def text_to_speech_stream_file(
@@ -160,43 +519,30 @@ async def text_to_speech_stream_file(
     """Generate complete audio first, then stream the file"""
     try:
         # Get the appropriate pipeline based on voice prefix
-        lang_code = voice[0]
-        if lang_code not in pipelines:
-            raise HTTPException(status_code=400, detail=f"Unsupported language code: {lang_code}")
-        
-        pipeline = pipelines[lang_code]
-
-        # Generate complete audio
-        generator = pipeline(text, voice=voice)
-        audio = None
-        for _, _, audio_chunk in generator:
-            if audio is None:
-                audio = audio_chunk
-            else:
-                audio = np.concatenate([audio, audio_chunk])
-
-        # Convert to bytes
-        wav_buffer = io.BytesIO()
-        sf.write(wav_buffer, audio, 24000, format='wav')
-        wav_buffer.seek(0)
-
-        # Convert to desired format
-        audio_segment = AudioSegment.from_wav(wav_buffer)
-        output_buffer = io.BytesIO()
-        audio_segment.export(output_buffer, format=format)
-        output_buffer.seek(0)
-
-        content_types = {
-            'mp3': 'audio/mpeg',
-            'wav': 'audio/wav',
-            'ogg': 'audio/ogg',
-            'aac': 'audio/aac',
-            'opus': 'audio/opus',
-        }
+        pipeline = await get_pipeline(voice[0])
+
+        # Generate complete audio via the micro-batching worker
+        audio = await synthesize_chunk(pipeline, text, voice)
+
+        # WAV goes straight through soundfile; lossy formats go straight
+        # through one ffmpeg subprocess fed raw PCM
+        if format == 'wav':
+            output_buffer = buf_pool.acquire()
+            sf.write(output_buffer, audio, 24000, format='wav', subtype='PCM_16')
+            output_buffer.seek(0)
+            return StreamingResponse(
+                iter_file(output_buffer, pool=buf_pool),
+                media_type='audio/wav',
+                headers={
+                    'Content-Disposition': 'attachment; filename="audio.wav"'
+                }
+            )
 
-        return StreamingResponse(
-            iter_file(output_buffer),
-            media_type=content_types[format],
+        encoded = await asyncio.to_thread(encode_audio, audio, format)
+
+        return Response(
+            encoded,
+            media_type=CONTENT_TYPES[format],
             headers={
                 'Content-Disposition': f'attachment; filename="audio.{format}"'
             }
@@ -205,6 +551,27 @@ async def text_to_speech_stream_file(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/stt")
+async def speech_to_text(file: UploadFile = File(...)):
+    """Transcribe uploaded audio with the resident faster-whisper model"""
+    try:
+        data = await file.read()
+
+        def run():
+            # Lazy import inside the worker thread: stt builds (and first
+            # time, downloads) the Whisper model at import, which would
+            # stall every other request if it ran on the event loop
+            import stt
+            segments, _ = stt.transcribe(io.BytesIO(data))
+            return ' '.join(segment.text.strip() for segment in segments)
+
+        # Transcription is CPU-bound, so keep it off the event loop
+        text = await asyncio.to_thread(run)
+        return {"text": text}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/voices")
 async def list_voices():
     """List all available voices"""
@@ -227,143 +594,131 @@ async def list_voices():
         ]
     }
 
-@app.get("/chat", response_class=HTMLResponse)
+@app.get("/chat")
 async def chat_interface():
     """Simple chat interface that speaks responses"""
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Loftwah's TTS Demo</title>
-        <script src="https://cdn.tailwindcss.com"></script>
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" />
-    </head>
-    <body class="bg-gray-100 min-h-screen">
-        <div class="container mx-auto px-4 py-8 max-w-4xl">
-            <div class="bg-white rounded-lg shadow-lg p-6">
-                <h1 class="text-3xl font-bold text-center mb-8 text-purple-600">
-                    <i class="fas fa-robot mr-2"></i>Loftwah's TTS Chat Demo
-                </h1>
-                
-                <div id="messages" class="space-y-4 mb-6 h-[400px] overflow-y-auto p-4 border rounded-lg">
-                    <div class="text-center text-gray-500">
-                        Start a conversation! The AI will respond with text and voice.
-                    </div>
-                </div>
-
-                <div class="flex gap-2">
-                    <input type="text" 
-                           id="userInput" 
-                           class="flex-1 px-4 py-2 border rounded-lg focus:outline-none focus:ring-2 focus:ring-purple-500"
-                           placeholder="Type your message here..."
-                           onkeyup="if(event.key === 'Enter') sendMessage()">
-                    <button onclick="sendMessage()" 
-                            class="bg-purple-600 text-white px-6 py-2 rounded-lg hover:bg-purple-700 transition-colors">
-                        <i class="fas fa-paper-plane mr-2"></i>Send
-                    </button>
-                </div>
-
-                <div class="mt-4 text-center text-sm text-gray-500">
-                    <p>Using OpenAI GPT-3.5 for text generation and custom TTS for voice synthesis</p>
-                </div>
-            </div>
-        </div>
-
-        <script>
-            let audioQueue = [];
-            let isPlaying = false;
-
-            function createMessageElement(text, isUser) {
-                const messageDiv = document.createElement('div');
-                messageDiv.className = `flex ${isUser ? 'justify-end' : 'justify-start'} mb-4`;
-                
-                const innerDiv = document.createElement('div');
-                innerDiv.className = `${isUser ? 'bg-purple-600 text-white' : 'bg-gray-200 text-gray-800'} rounded-lg px-4 py-2 max-w-[70%]`;
-                
-                const icon = document.createElement('i');
-                icon.className = `${isUser ? 'fas fa-user' : 'fas fa-robot'} mr-2`;
-                
-                const textSpan = document.createElement('span');
-                textSpan.textContent = text;
-                
-                innerDiv.appendChild(icon);
-                innerDiv.appendChild(textSpan);
-                messageDiv.appendChild(innerDiv);
-                
-                return messageDiv;
-            }
+    # Served from disk so Starlette can handle caching headers and the
+    # interpreter never rebuilds the page per request
+    return FileResponse("static/chat.html", media_type="text/html")
 
-            async function sendMessage() {
-                const input = document.getElementById('userInput');
-                const messages = document.getElementById('messages');
-                
-                if (!input.value.trim()) return;
-                
-                // Add user message
-                messages.appendChild(createMessageElement(input.value, true));
-                
-                // Scroll to bottom
-                messages.scrollTop = messages.scrollHeight;
-                
-                try {
-                    // Get LLM response
-                    const response = await fetch(`/chat/respond?message=${encodeURIComponent(input.value)}`);
-                    const data = await response.json();
-                    
-                    // Add assistant message
-                    messages.appendChild(createMessageElement(data.text, false));
-                    
-                    // Queue the audio
-                    audioQueue.push(data.text);
-                    playNextInQueue();
-                    
-                    // Clear input
-                    input.value = '';
-                    
-                    // Scroll to bottom again
-                    messages.scrollTop = messages.scrollHeight;
-                } catch (error) {
-                    console.error('Error:', error);
-                    messages.appendChild(createMessageElement('Sorry, an error occurred.', false));
-                }
-            }
+async def generate_chat_speech(message: str, voice: str) -> AsyncGenerator[bytes, None]:
+    """Stream a spoken LLM reply, overlapping token streaming with TTS.
 
-            async function playNextInQueue() {
-                if (isPlaying || audioQueue.length === 0) return;
-                
-                isPlaying = true;
-                const text = audioQueue.shift();
-                
-                try {
-                    const response = await fetch(`/tts/stream?text=${encodeURIComponent(text)}&voice=af_heart`);
-                    const audio = new Audio(URL.createObjectURL(await response.blob()));
-                    
-                    audio.onended = () => {
-                        isPlaying = false;
-                        playNextInQueue();
-                    };
-                    
-                    audio.play();
-                } catch (error) {
-                    console.error('Error playing audio:', error);
-                    isPlaying = false;
-                    playNextInQueue();
-                }
+    Each complete sentence is synthesized as soon as the LLM emits it, so
+    the first audio bytes go out long before the response has finished
+    generating instead of serializing the two phases.
+    """
+    pipeline = await get_pipeline(voice[0])
+
+    async def pcm_chunks():
+        stream = await openai_client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant. Keep responses brief and conversational."},
+                {"role": "user", "content": message}
+            ],
+            stream=True,
+        )
+
+        buf = ''
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            buf += delta
+            # Synthesize every complete sentence as soon as it's available
+            while (match := _SENT_RE.search(buf)):
+                sentence = buf[:match.start()].strip()
+                buf = buf[match.end():]
+                if sentence:
+                    yield await synthesize_chunk(pipeline, sentence, voice)
+        if buf.strip():
+            yield await synthesize_chunk(pipeline, buf.strip(), voice)
+
+    async for mp3_chunk in encode_mp3_stream(pcm_chunks()):
+        yield mp3_chunk
+
+@app.get("/chat/speak")
+async def chat_speak(message: str, voice: str = "af_heart"):
+    """Respond to a message with streamed speech, starting before the LLM finishes"""
+    try:
+        # Validate the voice prefix and warm the pipeline before streaming
+        await get_pipeline(voice[0])
+
+        return StreamingResponse(
+            generate_chat_speech(message, voice),
+            media_type='audio/mpeg',
+            headers={
+                'Content-Disposition': 'attachment; filename="audio.mp3"'
             }
-        </script>
-    </body>
-    </html>
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def generate_chat_events(message: str, voice: str) -> AsyncGenerator[str, None]:
+    """Interleave sentence text and MP3 audio as server-sent events.
+
+    Same overlapped LLM+TTS flow as generate_chat_speech, but each sentence
+    goes out as a text event right before its audio, so the chat page can
+    show the transcript while it speaks instead of audio-only.
     """
+    pipeline = await get_pipeline(voice[0])
+
+    async def speak(sentence: str) -> AsyncGenerator[str, None]:
+        yield f"event: text\ndata: {json.dumps(sentence)}\n\n"
+        audio = await synthesize_chunk(pipeline, sentence, voice)
+        mp3 = await asyncio.to_thread(encode_audio, audio, 'mp3')
+        yield f"event: audio\ndata: {json.dumps(base64.b64encode(mp3).decode('ascii'))}\n\n"
+
+    stream = await openai_client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are a helpful assistant. Keep responses brief and conversational."},
+            {"role": "user", "content": message}
+        ],
+        stream=True,
+    )
+
+    buf = ''
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        buf += delta
+        while (match := _SENT_RE.search(buf)):
+            sentence = buf[:match.start()].strip()
+            buf = buf[match.end():]
+            if sentence:
+                async for event in speak(sentence):
+                    yield event
+    if buf.strip():
+        async for event in speak(buf.strip()):
+            yield event
+    yield "event: done\ndata: {}\n\n"
+
+@app.get("/chat/speak/sse")
+async def chat_speak_sse(message: str, voice: str = "af_heart"):
+    """Spoken reply as SSE: sentence text events interleaved with MP3 audio"""
+    try:
+        # Validate the voice prefix and warm the pipeline before streaming
+        await get_pipeline(voice[0])
+
+        return StreamingResponse(
+            generate_chat_events(message, voice),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache'},
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/chat/respond")
 async def chat_respond(message: str):
     """Get LLM response for a message"""
     try:
-        # Initialize your LLM client (example using OpenAI)
-        client = AsyncOpenAI()
-        
-        # Get response from LLM
-        response = await client.chat.completions.create(
+        # Get response from LLM (client is shared at module level)
+        response = await openai_client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant. Keep responses brief and conversational."},
@@ -382,4 +737,6 @@ async def chat_respond(message: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000) 
\ No newline at end of file
+    # uvloop + httptools: C event loop and HTTP parser instead of the
+    # pure-Python defaults
+    uvicorn.run(app, host="127.0.0.1", port=8000, loop="uvloop", http="httptools")
@@ -0,0 +1,124 @@
+"""Persistent Kokoro daemon so repeated CLI runs skip model loading.
+
+Every plain `python tts.py` invocation re-imports torch and rebuilds the
+pipeline — seconds of startup that dwarf inference for short text. Run
+`python tts_daemon.py` once, then call the CLI with KOKORO_DAEMON=1 and
+each request is just tokenize -> infer -> write against the resident model.
+"""
+import functools
+import os
+import sys
+from multiprocessing.connection import Listener
+from pathlib import Path
+
+# Pin BLAS pools before torch loads them (see tts.py); batch-1 inference
+# is slower with a spinning thread team than without one
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+
+import torch
+import soundfile as sf
+
+# Reuse the CLI's builder: TF32 flags, optional KOKORO_COMPILE and the
+# FP16 model+voice-pack cast all live in one place, and lru_cache keeps
+# the pipelines resident (and on GPU) across requests
+from tts import DEFAULT_VOICES, get_pipeline
+
+SOCKET_PATH = os.environ.get('KOKORO_SOCKET', '/tmp/kokoro-tts.sock')
+
+@functools.lru_cache(maxsize=8)
+def get_warm_pipeline(lang_code, precision='auto'):
+    """Resident pipeline with the language's default voice pre-loaded"""
+    pipeline = get_pipeline(lang_code, precision)
+    # KPipeline keeps loaded voice packs resident on the device, so warming
+    # the default voice moves its disk read off the first request
+    if hasattr(pipeline, 'load_voice'):
+        try:
+            pipeline.load_voice(DEFAULT_VOICES[lang_code])
+        except Exception:
+            pass  # unknown voice layout — first request loads it instead
+    return pipeline
+
+def _fmt_args(output_file, default_fmt):
+    """libsndfile format/subtype for a target path"""
+    fmt = (output_file.suffix.lstrip('.') or default_fmt).upper()
+    return ({'WAV': 'WAV', 'MP3': 'MPEG', 'OGG': 'OGG'}.get(fmt),
+            'PCM_16' if fmt == 'WAV' else None)
+
+def handle(request):
+    """Synthesize one request and write the output file(s).
+
+    Mirrors the CLI: one continuous file by default, one file per segment
+    when the client passes per_segment, so KOKORO_DAEMON=1 produces the
+    same files as the in-process fallback.
+    """
+    text = request['text']
+    voice = request.get('voice', 'af_heart')
+    fmt = request.get('format', 'wav')
+    output = request.get('output')
+    per_segment = request.get('per_segment', False)
+
+    pipeline = get_warm_pipeline(voice[0], request.get('precision', 'auto'))
+
+    output_dir = Path('output')
+    output_dir.mkdir(exist_ok=True)
+
+    files = []
+    if not per_segment:
+        output_file = output_dir / (output or f"output_{voice}.{fmt}")
+        sf_fmt, subtype = _fmt_args(output_file, fmt)
+        with sf.SoundFile(str(output_file), mode='w', samplerate=24000,
+                          channels=1, format=sf_fmt, subtype=subtype) as f:
+            with torch.inference_mode():
+                for gs, ps, audio in pipeline(text, voice=voice):
+                    # Single device-to-host hop right before the file write
+                    if isinstance(audio, torch.Tensor):
+                        audio = audio.detach().cpu().numpy()
+                    f.write(audio)
+        files.append(str(output_file))
+        return {'ok': True, 'files': files}
+
+    with torch.inference_mode():
+        segments = list(pipeline(text, voice=voice))
+    for i, (gs, ps, audio) in enumerate(segments):
+        if output:
+            if len(segments) == 1:
+                output_file = output_dir / output
+            else:
+                name = Path(output).stem
+                suffix = Path(output).suffix
+                output_file = output_dir / f"{name}_{i}{suffix}"
+        else:
+            output_file = output_dir / f"output_{voice}_{i}.{fmt}"
+        if isinstance(audio, torch.Tensor):
+            audio = audio.detach().cpu().numpy()
+        sf_fmt, subtype = _fmt_args(output_file, fmt)
+        sf.write(str(output_file), audio, 24000, format=sf_fmt, subtype=subtype)
+        files.append(str(output_file))
+
+    return {'ok': True, 'files': files}
+
+def main():
+    # Clean up a stale socket from a previous run
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)
+
+    with Listener(SOCKET_PATH, 'AF_UNIX') as listener:
+        print(f"Kokoro daemon listening on {SOCKET_PATH}")
+        print("Invoke the CLI with KOKORO_DAEMON=1 to use it")
+        while True:
+            with listener.accept() as conn:
+                try:
+                    request = conn.recv()
+                    conn.send(handle(request))
+                except EOFError:
+                    continue
+                except Exception as e:
+                    conn.send({'ok': False, 'error': str(e)})
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(0)